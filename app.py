@@ -1,6 +1,20 @@
+import hmac
+import os
+import time
+import uuid
+
 import streamlit as st
-import google.generativeai as genai
-from datetime import datetime
+
+from backends import GeminiBackend, StubBackend
+from executor import ModelExecutor
+from message_store import MessageStore, is_valid_session_id
+from metrics import Metrics
+from pipeline import FAILED_REPLIES, ChatPipeline, ChatSession
+from prompt_builder import PromptBuilder, estimate_tokens
+from response_cache import MemoryResponseCache, SQLiteResponseCache
+from transcript import PAGE_SIZE, format_message, render_transcript
+
+rerun_started = time.perf_counter()
 
 # -----------------------------------------------------
 # 1. Page Config
@@ -10,13 +24,14 @@ st.set_page_config(page_title="Intelligent Chat Assistant", page_icon="✨")
 # -----------------------------------------------------
 # 2. Load API Key
 # -----------------------------------------------------
+# CHAT_BACKEND = "stub" runs the app offline against StubBackend.
+backend_name = st.secrets.get("CHAT_BACKEND", "gemini")
+retrieval_enabled = bool(st.secrets.get("RETRIEVAL_ENABLED"))
 api_key = st.secrets.get("GEMINI_API_KEY")
-if not api_key:
+if backend_name == "gemini" and not api_key:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit Cloud Secrets.")
     st.stop()
 
-genai.configure(api_key=api_key)
-
 # -----------------------------------------------------
 # 3. System Prompt
 # -----------------------------------------------------
@@ -33,46 +48,105 @@ Rules:
 # -----------------------------------------------------
 # 4. Initialize model
 # -----------------------------------------------------
-model = genai.GenerativeModel("gemini-flash-latest")
+# Process-wide latency histograms and counters (see the sidebar panel).
+@st.cache_resource
+def get_metrics():
+    return Metrics()
+
+metrics = get_metrics()
+
+# The Gemini SDK is only imported when the first message is sent; the
+# backend (and the model it builds) is then reused by every session.
+@st.cache_resource
+def get_backend(name, api_key):
+    if name == "stub":
+        return StubBackend(
+            latency=float(st.secrets.get("STUB_LATENCY", 0.5)),
+            first_token_latency=float(st.secrets.get("STUB_FIRST_TOKEN_LATENCY", 0.1)),
+            chunk_size=int(st.secrets.get("STUB_CHUNK_SIZE", 16)),
+            failure_rate=float(st.secrets.get("STUB_FAILURE_RATE", 0.0)))
+    return GeminiBackend(api_key, request_timeout=float(st.secrets.get("MODEL_TIMEOUT", 60)))
+
+# Shared by every session in this process; set RESPONSE_CACHE_PATH to keep
+# replies in a SQLite file that survives restarts instead.
+@st.cache_resource
+def get_response_cache():
+    cache_path = st.secrets.get("RESPONSE_CACHE_PATH")
+    if cache_path:
+        return SQLiteResponseCache(cache_path, ttl=int(st.secrets.get("RESPONSE_CACHE_TTL", 24 * 3600)))
+    return MemoryResponseCache(ttl=int(st.secrets.get("RESPONSE_CACHE_TTL", 3600)))
+
+# One pool of model calls for the whole process, so the number of requests
+# in flight stays bounded however many sessions are open.
+@st.cache_resource
+def get_model_executor():
+    return ModelExecutor(
+        max_concurrency=int(st.secrets.get("MODEL_MAX_CONCURRENCY", 8)),
+        timeout=float(st.secrets.get("MODEL_TIMEOUT", 60)),
+        max_retries=int(st.secrets.get("MODEL_MAX_RETRIES", 3)))
 
 # -----------------------------------------------------
 # 5. Session State for Messages
 # -----------------------------------------------------
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+if "chat" not in st.session_state:
+    # The session id lives in the URL so a reload or server restart resumes
+    # the same conversation from its log file.
+    session_id = st.query_params.get("session")
+    if not is_valid_session_id(session_id):
+        session_id = uuid.uuid4().hex
+        st.query_params["session"] = session_id
+    messages = MessageStore(
+        session_id,
+        directory=st.secrets.get("CHAT_STORE_DIR", ".chat_sessions") or None,
+        max_messages=int(st.secrets.get("CHAT_MAX_MESSAGES", 200)),
+        max_chars=int(st.secrets.get("CHAT_MAX_CHARS", 200_000)))
+
+    # Cap the history sent to the model; older turns are summarized. With
+    # retrieval on, older turns are found by relevance, so keep less verbatim.
+    token_budget = st.secrets.get("HISTORY_TOKEN_BUDGET")
+    if token_budget:
+        prompt_builder = PromptBuilder(int(token_budget), length=estimate_tokens)
+    else:
+        default_budget = 2000 if retrieval_enabled else 8000
+        prompt_builder = PromptBuilder(int(st.secrets.get("HISTORY_CHAR_BUDGET", default_budget)))
+
+    st.session_state.chat = ChatSession(messages, prompt_builder)
 
 if "last_input" not in st.session_state:
     st.session_state.last_input = None  # helps avoid double-submit
 
-# -----------------------------------------------------
-# 6. Format Chat History
-# -----------------------------------------------------
-def format_chat_history():
-    history_text = ""
-    for msg in st.session_state.messages:
-        role = "User" if msg["role"] == "user" else "AI"
-        history_text += f"{role}: {msg['parts'][0]}\n"
-    return history_text
+if "visible_messages" not in st.session_state:
+    st.session_state.visible_messages = PAGE_SIZE  # older ones sit behind "Load earlier"
 
 # -----------------------------------------------------
-# 7. Function to get response
+# 6. Chat Pipeline (history, cache and model call; see pipeline.py)
 # -----------------------------------------------------
-def get_fast_response(user_message):
-    current_datetime = datetime.now().strftime("%A, %B %d, %Y %H:%M:%S")
+# Optional retrieval (RETRIEVAL_ENABLED): the most relevant earlier turns and
+# chunks of RETRIEVAL_DOCS_DIR go into the prompt instead of a long history.
+@st.cache_resource
+def get_retriever():
+    from retrieval import HashingEmbedder, Retriever, build_document_index
 
-    full_prompt = f"""
-{SYSTEM_PROMPT}
+    embedder = HashingEmbedder()
+    documents = None
+    docs_dir = st.secrets.get("RETRIEVAL_DOCS_DIR")
+    if docs_dir:
+        index_dir = st.secrets.get("RETRIEVAL_INDEX_DIR", os.path.join(docs_dir, ".index"))
+        documents = build_document_index(docs_dir, embedder, index_dir)
+    return Retriever(embedder, documents, k=int(st.secrets.get("RETRIEVAL_TOP_K", 4)))
 
-Current date and time: {current_datetime}
+@st.cache_resource
+def get_pipeline(backend_name, api_key):
+    return ChatPipeline(
+        get_backend(backend_name, api_key), get_response_cache(), get_model_executor(),
+        metrics, SYSTEM_PROMPT, retriever=get_retriever() if retrieval_enabled else None)
 
-Chat history:
-{format_chat_history()}
-
-User: {user_message}
-AI:
-"""
-    response = model.generate_content(full_prompt)
-    return getattr(response, "text", "⚠️ AI could not generate a response.")
+# -----------------------------------------------------
+# 7. Function to get response
+# -----------------------------------------------------
+def get_fast_response(user_message, on_chunk=None):
+    return get_pipeline(backend_name, api_key).get_fast_response(
+        st.session_state.chat, user_message, on_chunk)
 
 # -----------------------------------------------------
 # 8. UI Header
@@ -83,15 +157,13 @@ st.write("A friendly AI chatbot ready to chat with you 🤖💬")
 # -----------------------------------------------------
 # 9.# Show Chat Messages
 # -----------------------------------------------------
-for msg in st.session_state.messages:
-    if msg["role"] == "user":
-        st.markdown(
-            f"<div class='chat-user'>🧑 <b>You:</b> {msg['parts'][0]}</div>",
-            unsafe_allow_html=True)
-    else:
-        st.markdown(
-            f"<div class='chat-ai'>🤖 <b>AI:</b> {msg['parts'][0]}</div>",
-            unsafe_allow_html=True)
+transcript = st.container()
+with transcript:
+    hidden = st.session_state.chat.messages.available - st.session_state.visible_messages
+    if hidden > 0 and st.button(f"⬆️ Load earlier messages ({hidden} hidden)"):
+        st.session_state.visible_messages += PAGE_SIZE
+    with metrics.timer("render_transcript_seconds"):
+        render_transcript(st, st.session_state.chat.messages, st.session_state.visible_messages)
 
 # -----------------------------------------------------
 # 10. Input Form 
@@ -107,19 +179,61 @@ if entered and user_input.strip():
     if st.session_state.last_input != user_input:
         st.session_state.last_input = user_input
 
-        # Add user message
-        st.session_state.messages.append({"role": "user", "parts": [user_input]})
+        # Draw the new turn straight into the transcript instead of rerunning.
+        # The user message is stored after the reply so the history (and the
+        # cache key built from it) only covers earlier turns.
+        with transcript:
+            st.markdown(format_message("user", user_input), unsafe_allow_html=True)
+            reply_box = st.empty()
 
-        # Generate AI response
-        ai_reply = get_fast_response(user_input)
-        st.session_state.messages.append({"role": "model", "parts": [ai_reply]})
+        def show_partial(text):
+            reply_box.markdown(format_message("model", text), unsafe_allow_html=True)
 
-        st.rerun()
+        ai_reply = get_fast_response(user_input, on_chunk=show_partial)
+        show_partial(ai_reply)
+        if ai_reply in FAILED_REPLIES:
+            # Keep errors out of the history and let the same message be resent.
+            st.session_state.last_input = None
+        else:
+            st.session_state.chat.add_turn(user_input, ai_reply)
 
 # -----------------------------------------------------
 # 11. Clear Chat
 # -----------------------------------------------------
 if st.button("Clear Chat"):
-    st.session_state.messages = []
+    st.session_state.chat.clear()
     st.session_state.last_input = None
+    st.session_state.visible_messages = PAGE_SIZE
     st.rerun()
+
+# -----------------------------------------------------
+# 12. Metrics Panel (admins only: open the app with ?admin=<METRICS_ADMIN_TOKEN>)
+# -----------------------------------------------------
+metrics.observe("rerun_seconds", time.perf_counter() - rerun_started)
+
+def is_metrics_admin():
+    token = st.secrets.get("METRICS_ADMIN_TOKEN")
+    supplied = st.query_params.get("admin")
+    return bool(token and supplied) and hmac.compare_digest(str(supplied), str(token))
+
+if is_metrics_admin():
+    with st.sidebar.expander("📊 Metrics"):
+        histograms, counters = metrics.snapshot()
+        st.table([
+            {
+                "metric": name,
+                "count": summary["count"],
+                "p50": round(summary["p50"], 4),
+                "p95": round(summary["p95"], 4),
+                "p99": round(summary["p99"], 4),
+            }
+            for name, summary in sorted(histograms.items())
+        ])
+        st.json({
+            **counters,
+            "startup": get_backend(backend_name, api_key).startup_timings,
+            "cache": get_response_cache().stats(),
+            "executor": get_model_executor().stats,
+        })
+        st.download_button("Prometheus", metrics.to_prometheus(), "metrics.prom", "text/plain")
+        st.download_button("JSON lines", metrics.to_json_lines(), "metrics.jsonl", "application/x-ndjson")
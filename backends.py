@@ -0,0 +1,123 @@
+"""Model backends: Gemini, and a deterministic offline stub for tests and benchmarks."""
+
+import abc
+import hashlib
+import random
+import threading
+import time
+
+WORDS = (
+    "a decorator wraps a function to add behaviour before or after it runs "
+    "use functools wraps to keep the name and docstring list comprehensions "
+    "build lists in one readable expression generators yield values lazily"
+).split()
+
+
+class ServiceUnavailable(Exception):
+    """Raised by StubBackend for injected failures; retried like the real API error."""
+
+
+class ModelBackend(abc.ABC):
+    """Interface: ``stream(prompt)`` yields the reply as text chunks."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def stream(self, prompt):
+        """Yield the reply to ``prompt`` as non-empty text chunks."""
+
+    def generate(self, prompt):
+        return "".join(self.stream(prompt))
+
+
+class GeminiBackend(ModelBackend):
+    """Google Gemini; the SDK is imported and the model built on first use.
+
+    ``request_timeout`` bounds each API request, so a stalled stream cannot
+    hold a worker thread forever.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key, model_name="gemini-flash-latest", request_timeout=60):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.request_timeout = request_timeout
+        self.startup_timings = {}
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                started = time.perf_counter()
+                import google.generativeai as genai
+                imported = time.perf_counter()
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+                self.startup_timings["genai_import_seconds"] = imported - started
+                self.startup_timings["model_init_seconds"] = time.perf_counter() - imported
+            return self._model
+
+    def stream(self, prompt):
+        response = self._get_model().generate_content(
+            prompt, stream=True, request_options={"timeout": self.request_timeout})
+        for chunk in response:
+            # Gemini raises ValueError on .text for chunks that carry no parts
+            # (e.g. a trailing safety/finish chunk), so skip those.
+            try:
+                text = chunk.text
+            except ValueError:
+                continue
+            if text:
+                yield text
+
+
+class StubBackend(ModelBackend):
+    """Offline backend with a reply derived from the prompt.
+
+    ``first_token_latency`` (plus ``prompt_latency`` per 1,000 prompt
+    characters, standing in for prompt processing) is waited before the
+    first chunk and ``latency`` is spread across the remaining ones.
+    ``failure_rate`` is the chance a call raises ServiceUnavailable before
+    streaming anything; failures are drawn from a generator seeded with
+    ``seed``, so runs are repeatable.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=0.0, first_token_latency=0.0, chunk_size=16,
+                 reply_words=60, failure_rate=0.0, seed=0, prompt_latency=0.0):
+        self.latency = latency
+        self.first_token_latency = first_token_latency
+        self.prompt_latency = prompt_latency
+        self.chunk_size = chunk_size
+        self.reply_words = reply_words
+        self.failure_rate = failure_rate
+        self.startup_timings = {}
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reply_for(self, prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return " ".join(WORDS[(digest[i % len(digest)] + i) % len(WORDS)]
+                        for i in range(self.reply_words))
+
+    def stream(self, prompt):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.failure_rate
+        wait = self.first_token_latency + self.prompt_latency * len(prompt) / 1000
+        if wait:
+            time.sleep(wait)
+        if failed:
+            raise ServiceUnavailable("503 stub backend unavailable")
+
+        reply = self.reply_for(prompt)
+        chunks = [reply[i:i + self.chunk_size] for i in range(0, len(reply), self.chunk_size)]
+        pause = self.latency / len(chunks) if self.latency else 0.0
+        for i, chunk in enumerate(chunks):
+            if pause and i:
+                time.sleep(pause)
+            yield chunk
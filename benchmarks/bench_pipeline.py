@@ -0,0 +1,116 @@
+"""Headless end-to-end benchmark of the chat pipeline against StubBackend.
+
+Simulates concurrent sessions, each sending a number of turns through the
+same ChatPipeline the app uses (history, response cache, executor,
+streaming, metrics), with no network access.
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py --sessions 32 --turns 10 --latency 0.2
+
+Pass --max-p95 to exit non-zero when the p95 reply latency regresses.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import StubBackend  # noqa: E402
+from executor import ModelExecutor  # noqa: E402
+from message_store import MessageStore  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from pipeline import FAILED_REPLIES, ChatPipeline, ChatSession  # noqa: E402
+from prompt_builder import PromptBuilder  # noqa: E402
+from response_cache import MemoryResponseCache  # noqa: E402
+
+SYSTEM_PROMPT = "You are an Intelligent Chat Assistant."
+QUESTIONS = [
+    "What is a Python decorator?",
+    "How do I reverse a list?",
+    "Explain list comprehensions.",
+    "What does functools.wraps do?",
+    "How do generators differ from lists?",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub reply time in seconds")
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=8, help="executor max concurrency")
+    parser.add_argument("--repeat-rate", type=float, default=0.3,
+                        help="share of turns that ask a common FAQ question")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p95", type=float, help="fail if p95 reply latency exceeds this")
+    parser.add_argument("--json", action="store_true", help="print metrics as JSON lines")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    backend = StubBackend(
+        latency=args.latency, first_token_latency=args.first_token_latency,
+        chunk_size=args.chunk_size, failure_rate=args.failure_rate, seed=args.seed)
+    metrics = Metrics()
+    executor = ModelExecutor(max_concurrency=args.concurrency, backoff=0.05)
+    pipeline = ChatPipeline(backend, MemoryResponseCache(), executor, metrics, SYSTEM_PROMPT)
+    failures = []
+
+    def run_session(index):
+        rng = random.Random(args.seed * 1000 + index)
+        session = ChatSession(MessageStore(f"bench-{index}"), PromptBuilder())
+        for turn in range(args.turns):
+            if turn == 0 or rng.random() < args.repeat_rate:
+                question = rng.choice(QUESTIONS)
+            else:
+                question = f"Session {index}, follow-up {turn}: can you expand on that?"
+            reply = pipeline.get_fast_response(session, question, on_chunk=lambda text: None)
+            if reply in FAILED_REPLIES:
+                failures.append(reply)
+                continue
+            session.add_turn(question, reply)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run_session, args=(i,)) for i in range(args.sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    histograms, counters = metrics.snapshot()
+    # Failed turns are observed too: they come back as TIMEOUT_REPLY / ERROR_REPLY.
+    replies = histograms["get_fast_response_seconds"]["count"] - len(failures)
+    print(f"{args.sessions} sessions x {args.turns} turns in {elapsed:.2f} s: "
+          f"{replies / elapsed:.1f} replies/s, {len(failures)} failed "
+          f"({counters.get('model_timeouts_total', 0)} timeouts, "
+          f"{counters.get('model_errors_total', 0)} errors)")
+    for name in ("get_fast_response_seconds", "model_first_token_seconds", "model_seconds",
+                 "format_chat_history_seconds"):
+        summary = histograms.get(name)
+        if summary:
+            print(f"{name:<30} p50 {summary['p50'] * 1000:8.2f} ms  "
+                  f"p95 {summary['p95'] * 1000:8.2f} ms  p99 {summary['p99'] * 1000:8.2f} ms")
+    print(f"backend calls {backend.calls}, cache hits {counters.get('cache_hits_total', 0)}, "
+          f"executor {executor.stats}")
+    if args.json:
+        print(metrics.to_json_lines(), end="")
+
+    p95 = histograms["get_fast_response_seconds"]["p95"]
+    if args.max_p95 is not None and p95 > args.max_p95:
+        print(f"FAIL: p95 {p95:.3f} s exceeds --max-p95 {args.max_p95:.3f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare full-transcript history rebuilding with the incremental PromptBuilder.
+
+Run from the repository root:
+
+    python benchmarks/bench_prompt_builder.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_builder import PromptBuilder  # noqa: E402
+
+SESSION_LENGTHS = (10, 100, 1000)
+USER_TEXT = "How do I write a Python decorator that caches results for a function? "
+AI_TEXT = "You can use functools.lru_cache, or write a wrapper that stores results in a dict. " * 4
+
+
+def legacy_history(messages):
+    history_text = ""
+    for msg in messages:
+        role = "User" if msg["role"] == "user" else "AI"
+        history_text += f"{role}: {msg['parts'][0]}\n"
+    return history_text
+
+
+def run_legacy(turns):
+    messages = []
+    total = 0.0
+    history = ""
+    for _ in range(turns):
+        messages.append({"role": "user", "parts": [USER_TEXT]})
+        start = time.perf_counter()
+        history = legacy_history(messages)
+        total += time.perf_counter() - start
+        messages.append({"role": "model", "parts": [AI_TEXT]})
+    return total, len(history)
+
+
+def run_builder(turns):
+    builder = PromptBuilder()
+    total = 0.0
+    history = ""
+    for _ in range(turns):
+        start = time.perf_counter()
+        builder.append("user", USER_TEXT)
+        history = builder.history()
+        total += time.perf_counter() - start
+        builder.append("model", AI_TEXT)
+    return total, len(history)
+
+
+def main():
+    print(f"{'turns':>6} | {'legacy ms':>10} {'chars':>9} | {'builder ms':>10} {'chars':>7}")
+    for turns in SESSION_LENGTHS:
+        legacy_time, legacy_size = run_legacy(turns)
+        builder_time, builder_size = run_builder(turns)
+        print(f"{turns:>6} | {legacy_time * 1000:>10.2f} {legacy_size:>9} | "
+              f"{builder_time * 1000:>10.2f} {builder_size:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Show repeated FAQ questions being served from the response cache.
+
+Run from the repository root:
+
+    python benchmarks/bench_response_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import StubBackend  # noqa: E402
+from response_cache import MemoryResponseCache, SQLiteResponseCache, cache_key  # noqa: E402
+from streaming import stream_response  # noqa: E402
+
+QUESTIONS = [
+    "What is a Python decorator?",
+    "what is a python decorator",
+    "How do I reverse a list?",
+    "What is a Python   decorator?",
+    "how do i reverse a list",
+    "Explain list comprehensions.",
+] * 20
+LATENCY = 0.02
+
+
+def run(cache):
+    backend = StubBackend(latency=LATENCY)
+    start = time.perf_counter()
+    for question in QUESTIONS:
+        key = cache_key(question, "")
+        if cache.get(key) is None:
+            cache.put(key, stream_response(backend, question).text)
+    return time.perf_counter() - start, backend.calls
+
+
+def main():
+    print(f"{len(QUESTIONS)} questions, {LATENCY * 1000:.0f} ms stub backend latency")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cache in (("memory", MemoryResponseCache()),
+                            ("sqlite", SQLiteResponseCache(os.path.join(tmp, "cache.db")))):
+            elapsed, calls = run(cache)
+            stats = cache.stats()
+            print(f"{name:>6}: {elapsed * 1000:8.1f} ms, backend calls {calls}, "
+                  f"hits {stats['hits']}, misses {stats['misses']}")
+    print(f"uncached: {len(QUESTIONS) * LATENCY * 1000:8.1f} ms, backend calls {len(QUESTIONS)}")
+
+
+if __name__ == "__main__":
+    main()
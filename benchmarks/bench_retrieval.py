@@ -0,0 +1,90 @@
+"""Prompt size and reply latency: full history vs. budgeted history vs. retrieval.
+
+A long session is replayed through ChatPipeline three ways. The stub
+backend charges time per prompt character, standing in for the cost of
+prompt processing, so bigger prompts answer more slowly.
+
+Run from the repository root:
+
+    python benchmarks/bench_retrieval.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import StubBackend  # noqa: E402
+from executor import ModelExecutor  # noqa: E402
+from message_store import MessageStore  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from pipeline import ChatPipeline, ChatSession  # noqa: E402
+from prompt_builder import PromptBuilder  # noqa: E402
+from response_cache import MemoryResponseCache  # noqa: E402
+from retrieval import HashingEmbedder, Retriever, build_document_index  # noqa: E402
+
+TURNS = 300
+DOCUMENTS = 200
+PROMPT_LATENCY = 0.002  # seconds per 1,000 prompt characters
+TOPICS = ["decorators", "generators", "list comprehensions", "context managers", "dataclasses",
+          "type hints", "asyncio", "pandas groupby", "SQL joins", "unit testing"]
+
+
+def write_documents(directory):
+    for i in range(DOCUMENTS):
+        topic = TOPICS[i % len(TOPICS)]
+        with open(os.path.join(directory, f"faq_{i:03}.md"), "w", encoding="utf-8") as f:
+            f.write(f"# {topic} note {i}\n\n"
+                    f"{topic} are explained here with example {i}. " * 8 + "\n\n"
+                    f"Common mistakes with {topic} and how to avoid them ({i}).\n")
+
+
+def run(name, prompt_builder, retriever):
+    metrics = Metrics()
+    backend = StubBackend(prompt_latency=PROMPT_LATENCY, reply_words=40)
+    executor = ModelExecutor(max_concurrency=1)
+    pipeline = ChatPipeline(backend, MemoryResponseCache(max_entries=0), executor, metrics,
+                            "You are an Intelligent Chat Assistant.", retriever=retriever)
+    session = ChatSession(MessageStore("bench", max_messages=2 * TURNS), prompt_builder)
+
+    started = time.perf_counter()
+    for turn in range(TURNS):
+        question = f"Turn {turn}: tell me more about {TOPICS[turn % len(TOPICS)]} please"
+        session.add_turn(question, pipeline.get_fast_response(session, question))
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    histograms, _ = metrics.snapshot()
+    latency = histograms["get_fast_response_seconds"]
+    tokens = histograms["prompt_tokens"]
+    retrieval = histograms.get("retrieval_seconds", {"p50": 0.0})
+    print(f"{name:<18} {tokens['p50']:>8.0f} {tokens['max']:>8.0f} "
+          f"{latency['p50'] * 1000:>8.2f} {latency['p95'] * 1000:>8.2f} "
+          f"{retrieval['p50'] * 1000:>9.3f} {elapsed:>7.2f}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as docs_dir:
+        write_documents(docs_dir)
+        embedder = HashingEmbedder()
+        started = time.perf_counter()
+        documents = build_document_index(docs_dir, embedder, os.path.join(docs_dir, ".index"))
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        build_document_index(docs_dir, embedder, os.path.join(docs_dir, ".index"))
+        reloaded = time.perf_counter() - started
+        print(f"document index: {len(documents)} chunks, built in {built * 1000:.1f} ms, "
+              f"reloaded (memory-mapped) in {reloaded * 1000:.1f} ms")
+        print(f"{TURNS} turns; prompt tokens p50/max, reply latency p50/p95 ms, retrieval p50 ms")
+        print(f"{'':<18} {'tok p50':>8} {'tok max':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'retr ms':>9} {'total s':>7}")
+
+        run("full history", PromptBuilder(budget=10 ** 12), None)
+        run("budgeted history", PromptBuilder(budget=8000), None)
+        run("retrieval", PromptBuilder(budget=2000), Retriever(embedder, documents))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold and warm start cost of the Gemini client, eager vs. lazy/cached setup.
+
+Each cold measurement runs in a fresh interpreter. "Per rerun" is what a
+Streamlit rerun pays for client setup: the old app reconfigured the SDK
+and built a new GenerativeModel every time, the cached one does a lookup.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+RERUNS = 200
+
+APP_MODULES = ("import backends, executor, message_store, metrics, pipeline, prompt_builder, "
+               "response_cache, streaming, transcript")
+
+EAGER_CHILD = """
+import time
+t0 = time.perf_counter()
+import google.generativeai as genai
+t1 = time.perf_counter()
+genai.configure(api_key="benchmark")
+genai.GenerativeModel("gemini-flash-latest")
+t2 = time.perf_counter()
+for _ in range({reruns}):
+    genai.configure(api_key="benchmark")
+    genai.GenerativeModel("gemini-flash-latest")
+t3 = time.perf_counter()
+cache = {{}}
+for _ in range({reruns}):
+    if "model" not in cache:
+        cache["model"] = genai.GenerativeModel("gemini-flash-latest")
+t4 = time.perf_counter()
+print(t1 - t0, t2 - t1, (t3 - t2) / {reruns}, (t4 - t3) / {reruns})
+""".format(reruns=RERUNS)
+
+
+def python(code):
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return time.perf_counter() - start, completed
+
+
+def row(label, value, unit):
+    print(f"{label + ':':<32}{value:8.1f} {unit}")
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    baseline = median([python("pass")[0] for _ in range(RUNS)])
+    modules = median([python(APP_MODULES)[0] for _ in range(RUNS)])
+    row("interpreter start", baseline * 1000, "ms")
+    row("app helper modules (lazy path)", (modules - baseline) * 1000, "ms")
+
+    _, probe = python("import google.generativeai")
+    if probe.returncode != 0:
+        print("google-generativeai is not installed; skipping SDK timings")
+        return
+
+    runs = []
+    for _ in range(RUNS):
+        wall, completed = python(EAGER_CHILD)
+        runs.append([wall] + [float(x) for x in completed.stdout.split()])
+    wall, sdk_import, model_init, per_rerun_eager, per_rerun_cached = (
+        median([run[i] for run in runs]) for i in range(5))
+    row("google.generativeai import", sdk_import * 1000, "ms (now paid on first message)")
+    row("configure + GenerativeModel", model_init * 1000, "ms")
+    row("per rerun, eager setup", per_rerun_eager * 1e6, "us")
+    row("per rerun, cached model", per_rerun_cached * 1e6, "us")
+    row("cold start, eager (wall)", wall * 1000, "ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Script time spent drawing the transcript, legacy loop vs. paged memoized renderer.
+
+Streamlit is replaced by a sink that serializes each markdown call, which
+stands in for the per-element work Streamlit does on every rerun.
+
+Run from the repository root:
+
+    python benchmarks/bench_transcript.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from message_store import MessageStore  # noqa: E402
+from transcript import PAGE_SIZE, render_transcript  # noqa: E402
+
+TRANSCRIPT_LENGTHS = (50, 500, 5000)
+RERUNS = 20
+
+
+class Sink:
+    def __init__(self):
+        self.elements = 0
+        self.bytes = 0
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.elements += 1
+        self.bytes += len(body.encode("utf-8"))
+
+
+def make_messages(count):
+    messages = []
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "model"
+        text = f"Message {i}: " + "some explanation with `code` and text. " * 6
+        messages.append({"role": role, "parts": [text]})
+    return messages
+
+
+def legacy_rerun(sink, messages):
+    for msg in messages:
+        if msg["role"] == "user":
+            sink.markdown(
+                f"<div class='chat-user'>🧑 <b>You:</b> {msg['parts'][0]}</div>",
+                unsafe_allow_html=True)
+        else:
+            sink.markdown(
+                f"<div class='chat-ai'>🤖 <b>AI:</b> {msg['parts'][0]}</div>",
+                unsafe_allow_html=True)
+
+
+def paged_rerun(sink, store):
+    render_transcript(sink, store, PAGE_SIZE)
+
+
+def make_store(messages):
+    store = MessageStore("bench", max_messages=len(messages), max_chars=10 ** 9)
+    for msg in messages:
+        store.append(msg["role"], msg["parts"][0])
+    return store
+
+
+def measure(rerun, messages, reruns_per_turn):
+    sink = Sink()
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        for _ in range(reruns_per_turn):
+            rerun(sink, messages)
+    elapsed = (time.perf_counter() - start) / RERUNS
+    return elapsed, sink.elements // RERUNS, sink.bytes // RERUNS
+
+
+def main():
+    print("per interaction (legacy does two reruns per reply, paged does one)")
+    print(f"{'messages':>8} | {'legacy ms':>9} {'elements':>8} {'KiB':>7} | "
+          f"{'paged ms':>8} {'elements':>8} {'KiB':>5}")
+    for count in TRANSCRIPT_LENGTHS:
+        messages = make_messages(count)
+        legacy = measure(legacy_rerun, messages, 2)
+        paged = measure(paged_rerun, make_store(messages), 1)
+        print(f"{count:>8} | {legacy[0] * 1000:>9.2f} {legacy[1]:>8} {legacy[2] / 1024:>7.0f} | "
+              f"{paged[0] * 1000:>8.2f} {paged[1]:>8} {paged[2] / 1024:>5.0f}")
+
+
+if __name__ == "__main__":
+    main()
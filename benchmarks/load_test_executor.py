@@ -0,0 +1,101 @@
+"""Load test: many sessions calling a stub model directly vs. through ModelExecutor.
+
+The stub answers after a fixed latency and, like a rate-limited API, fails
+with ResourceExhausted when more than RATE_LIMIT calls are in flight.
+
+Run from the repository root:
+
+    python benchmarks/load_test_executor.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import StubBackend  # noqa: E402
+from executor import ModelExecutor  # noqa: E402
+from streaming import stream_response  # noqa: E402
+
+SESSIONS = 48
+DISTINCT_QUESTIONS = 12
+LATENCY = 0.2
+RATE_LIMIT = 8
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+class RateLimitedStub(StubBackend):
+    def __init__(self):
+        super().__init__(latency=LATENCY, chunk_size=64)
+        self.in_flight = 0
+
+    def stream(self, prompt):
+        with self._lock:
+            self.in_flight += 1
+            over_limit = self.in_flight > RATE_LIMIT
+            if over_limit:
+                self.calls += 1
+        try:
+            if over_limit:
+                time.sleep(LATENCY / 10)
+                raise ResourceExhausted("429 quota exceeded")
+            yield from super().stream(prompt)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def run_sessions(ask):
+    ok = []
+    failed = []
+    latencies = []
+
+    def session(i):
+        question = f"question {i % DISTINCT_QUESTIONS}"
+        start = time.perf_counter()
+        try:
+            ask(question)
+        except Exception:
+            failed.append(i)
+        else:
+            ok.append(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, len(ok), len(failed), sorted(latencies)
+
+
+def report(name, model, elapsed, ok, failed, latencies):
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"{name:>8}: {elapsed:6.2f} s, {ok / elapsed:6.1f} replies/s, ok {ok:>3}, "
+          f"failed {failed:>3}, backend calls {model.calls:>3}, p95 {p95 * 1000:7.1f} ms")
+
+
+def main():
+    print(f"{SESSIONS} concurrent sessions, {DISTINCT_QUESTIONS} distinct questions, "
+          f"{LATENCY * 1000:.0f} ms latency, backend limit {RATE_LIMIT} in flight")
+
+    model = RateLimitedStub()
+    report("direct", model, *run_sessions(lambda q: stream_response(model, q)))
+
+    model = RateLimitedStub()
+    executor = ModelExecutor(max_concurrency=RATE_LIMIT, timeout=30, backoff=0.05)
+    report("executor", model, *run_sessions(
+        lambda q: executor.run(q, lambda emit: stream_response(model, q, emit))))
+    print(f"executor stats: {executor.stats}")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Process-wide pool for model calls: concurrency limit, timeouts, retries, coalescing."""
+
+import queue
+import random
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+# Exception class names raised by google.api_core for errors worth retrying.
+# Matched by name so this module does not need the Google SDK installed.
+TRANSIENT_ERRORS = {
+    "DeadlineExceeded",
+    "InternalServerError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "TooManyRequests",
+    "GatewayTimeout",
+}
+
+_DONE = object()
+
+
+def is_transient(exc):
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return type(exc).__name__ in TRANSIENT_ERRORS
+
+
+class _Call:
+    """One in-flight model call and the callers waiting on it."""
+
+    def __init__(self):
+        self.future = None
+        self.emitted = False
+        self.abandoned = False  # every caller gave up; stop at the next chunk
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        updates = queue.SimpleQueue()
+        with self._lock:
+            self._listeners.append(updates)
+        return updates
+
+    def unsubscribe(self, updates):
+        with self._lock:
+            if updates in self._listeners:
+                self._listeners.remove(updates)
+
+    @property
+    def waiting(self):
+        return bool(self._listeners)
+
+    def emit(self, text):
+        if self.abandoned and text is not _DONE:
+            # Raised inside the backend's stream loop, which closes the request.
+            raise CancelledError("no caller is waiting for this model call")
+        self.emitted = True
+        with self._lock:
+            listeners = list(self._listeners)
+        for updates in listeners:
+            updates.put(text)
+
+    def finish(self):
+        self.emit(_DONE)
+
+
+class ModelExecutor:
+    """Run model calls on a shared thread pool.
+
+    ``run(key, fn, on_chunk)`` calls ``fn(emit)`` on a worker thread, where
+    ``emit`` takes the text streamed so far.  Those updates are handed back
+    to ``on_chunk`` on the calling thread, so Streamlit elements are only
+    touched from the script thread.  Calls sharing a non-``None`` ``key``
+    while one is in flight are coalesced onto that call.  When the last
+    caller waiting on a call times out, a queued call is cancelled and a
+    running one stops at its next chunk; either way a resend starts afresh.
+    """
+
+    def __init__(self, max_concurrency=8, timeout=60, max_retries=3, backoff=0.5, max_backoff=8):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="model-call")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0, "retries": 0, "timeouts": 0, "errors": 0,
+                      "cancelled": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _execute(self, key, call, fn):
+        try:
+            attempt = 0
+            while True:
+                try:
+                    return fn(call.emit)
+                except Exception as exc:
+                    # Once text has been shown, a retry would replay it from the start.
+                    if (attempt >= self.max_retries or call.emitted or call.abandoned
+                            or not is_transient(exc)):
+                        if not call.abandoned:
+                            self._count("errors")
+                        raise
+                    delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                    attempt += 1
+                    self._count("retries")
+                    time.sleep(delay * random.uniform(0.5, 1.0))
+        finally:
+            with self._lock:
+                if key is not None and self._in_flight.get(key) is call:
+                    del self._in_flight[key]
+            call.finish()
+
+    def run(self, key, fn, on_chunk=None, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            call = self._in_flight.get(key) if key is not None else None
+            if call is None:
+                call = _Call()
+                updates = call.subscribe()
+                if key is not None:
+                    self._in_flight[key] = call
+                self.stats["calls"] += 1
+                call.future = self._pool.submit(self._execute, key, call, fn)
+            else:
+                updates = call.subscribe()
+                self.stats["coalesced"] += 1
+
+        deadline = time.monotonic() + timeout
+        finished = False
+        try:
+            while True:
+                try:
+                    item = updates.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self._count("timeouts")
+                    raise TimeoutError(f"model call did not finish within {timeout} seconds") from None
+                # Only draw the newest text when several chunks arrived at once.
+                latest = None
+                while item is not _DONE:
+                    latest = item
+                    if updates.empty():
+                        break
+                    item = updates.get_nowait()
+                if latest is not None and on_chunk is not None:
+                    on_chunk(latest)
+                if item is _DONE:
+                    finished = True
+                    break
+        finally:
+            with self._lock:
+                call.unsubscribe(updates)
+                if not finished and not call.waiting:
+                    self._abandon(key, call)
+
+        return call.future.result()
+
+    def _abandon(self, key, call):
+        # Called with self._lock held, so no new caller can join the call meanwhile.
+        call.abandoned = True
+        call.future.cancel()
+        self.stats["cancelled"] += 1
+        if key is not None and self._in_flight.get(key) is call:
+            del self._in_flight[key]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
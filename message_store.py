@@ -0,0 +1,160 @@
+"""Per-session chat messages with a memory cap and an append-only JSONL log."""
+
+import json
+import os
+import re
+import sys
+from collections import deque
+from itertools import islice
+
+_SESSION_ID = re.compile(r"[0-9a-f]{32}")
+_BLOCK_SIZE = 64 * 1024
+
+
+def is_valid_session_id(session_id):
+    # Session ids come from the URL and end up in a file name.
+    return bool(session_id) and _SESSION_ID.fullmatch(session_id) is not None
+
+
+class Message:
+    __slots__ = ("role", "text", "html")
+
+    def __init__(self, role, text):
+        self.role = sys.intern(role)
+        self.text = text
+        self.html = None  # rendered transcript HTML, filled in by transcript.py
+
+
+def _decode(line):
+    try:
+        record = json.loads(line)
+        return Message(record["role"], record["text"])
+    except (ValueError, KeyError, TypeError):
+        # A corrupt line is skipped (a partial last one is trimmed on resume).
+        return None
+
+
+def _count_lines(path):
+    count = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            count += block.count(b"\n")
+    return count
+
+
+def _trim_partial_line(path):
+    """Cut off a last line left without its newline by a crash mid-write."""
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(_BLOCK_SIZE, position)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != end:
+            f.truncate(position)
+
+
+def _tail_lines(path, n):
+    """Return the last ``n`` lines of ``path``, reading backwards from the end."""
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= n:
+            step = min(_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-n:]
+
+
+class MessageStore:
+    """Messages for one chat session.
+
+    Only the newest messages are kept in memory, bounded by ``max_messages``
+    and ``max_chars``.  When ``directory`` is set every message is also
+    appended to ``<directory>/<session_id>.jsonl``, so older turns can be
+    read back from disk and the session resumes after a restart.
+    """
+
+    def __init__(self, session_id, directory=None, max_messages=200, max_chars=200_000):
+        self.session_id = session_id
+        self.max_messages = max_messages
+        self.max_chars = max_chars
+        self.path = os.path.join(directory, f"{session_id}.jsonl") if directory else None
+        self._recent = deque()
+        self._chars = 0
+        self._total = 0
+
+        if self.path:
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.path):
+                self._resume()
+
+    def _resume(self):
+        # Otherwise the next append would be glued onto the partial line.
+        _trim_partial_line(self.path)
+        self._total = _count_lines(self.path)
+        for line in _tail_lines(self.path, self.max_messages):
+            message = _decode(line)
+            if message is not None:
+                self._keep(message)
+
+    def _keep(self, message):
+        self._recent.append(message)
+        self._chars += len(message.text)
+        while len(self._recent) > 1 and (
+                len(self._recent) > self.max_messages or self._chars > self.max_chars):
+            self._chars -= len(self._recent.popleft().text)
+
+    def __len__(self):
+        return self._total
+
+    def __iter__(self):
+        return iter(self._recent)
+
+    @property
+    def in_memory(self):
+        return len(self._recent)
+
+    @property
+    def available(self):
+        # Without a log file, messages evicted from memory are gone.
+        return self._total if self.path else len(self._recent)
+
+    def append(self, role, text):
+        message = Message(role, text)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"role": role, "text": text}, ensure_ascii=False) + "\n")
+        self._total += 1
+        self._keep(message)
+        return message
+
+    def since(self, index):
+        """Messages from absolute position ``index`` on that are still in memory."""
+        skip = index - (self._total - len(self._recent))
+        return list(islice(self._recent, max(0, skip), None))
+
+    def tail(self, n):
+        """The newest ``n`` messages, reading from disk past the in-memory window."""
+        n = min(n, self._total)
+        if n <= len(self._recent) or not self.path:
+            return list(islice(self._recent, max(0, len(self._recent) - n), None))
+        return [m for m in map(_decode, _tail_lines(self.path, n)) if m is not None]
+
+    def clear(self):
+        self._recent.clear()
+        self._chars = 0
+        self._total = 0
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
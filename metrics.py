@@ -0,0 +1,116 @@
+"""Low-overhead latency histograms and counters with Prometheus / JSON lines export."""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket upper bounds in seconds, 25% apart from 0.1 ms to about 2 minutes,
+# which keeps interpolated quantiles within a few percent.
+LATENCY_BUCKETS = tuple(round(0.0001 * 1.25 ** i, 7) for i in range(64))
+# Bucket upper bounds for sizes in tokens, 25% apart up to about 1M.
+SIZE_BUCKETS = tuple(sorted({round(1.25 ** i) for i in range(63)}))
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are interpolated within a bucket."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Named histograms and counters shared by every session in the process."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return (
+                {name: h.summary() for name, h in self._histograms.items()},
+                dict(self._counters),
+            )
+
+    def to_prometheus(self, prefix="chatbot_"):
+        lines = []
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                lines.append(f"{prefix}{name} {value}")
+            for name, h in sorted(self._histograms.items()):
+                metric = prefix + name
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(h.buckets, h.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{le="{bound:.10g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum:.10g}")
+                lines.append(f"{metric}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self):
+        histograms, counters = self.snapshot()
+        timestamp = time.time()
+        lines = [json.dumps({"ts": timestamp, "type": "counter", "name": name, "value": value})
+                 for name, value in sorted(counters.items())]
+        lines += [json.dumps({"ts": timestamp, "type": "histogram", "name": name, **summary})
+                  for name, summary in sorted(histograms.items())]
+        return "\n".join(lines) + "\n"
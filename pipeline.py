@@ -0,0 +1,148 @@
+"""The chat pipeline without Streamlit: history, cache, model call, metrics."""
+
+import logging
+import time
+from datetime import datetime
+
+from metrics import SIZE_BUCKETS
+from prompt_builder import estimate_tokens
+from response_cache import cache_key, is_cacheable
+from streaming import FALLBACK_REPLY, stream_response
+
+TIMEOUT_REPLY = "⚠️ The AI took too long to respond. Please try again."
+ERROR_REPLY = "⚠️ The AI is unavailable right now. Please try again."
+# Replies shown to the user but never stored as model turns or cached.
+FAILED_REPLIES = (TIMEOUT_REPLY, ERROR_REPLY)
+
+logger = logging.getLogger(__name__)
+
+
+def build_prompt(system_prompt, user_message, history, context=""):
+    current_datetime = datetime.now().strftime("%A, %B %d, %Y %H:%M:%S")
+    if context:
+        context = f"\nRelevant context (earlier turns and documents):\n{context}\n"
+
+    full_prompt = f"""
+{system_prompt}
+
+Current date and time: {current_datetime}
+{context}
+Chat history:
+{history}
+
+User: {user_message}
+AI:
+"""
+    return full_prompt
+
+
+class ChatSession:
+    """One conversation: its MessageStore and the PromptBuilder fed from it."""
+
+    def __init__(self, messages, prompt_builder):
+        self.messages = messages
+        self.prompt_builder = prompt_builder
+        self.history_synced = 0  # messages already fed to the builder
+        self.retrieval = None  # TurnMemory when a Retriever is in use
+
+    def format_chat_history(self):
+        if self.history_synced > len(self.messages):
+            self.prompt_builder.reset()
+            self.history_synced = 0
+        for msg in self.messages.since(self.history_synced):
+            self.prompt_builder.append(msg.role, msg.text)
+        self.history_synced = len(self.messages)
+        return self.prompt_builder.history()
+
+    @property
+    def window_start(self):
+        """Absolute position of the oldest message the last history carries verbatim."""
+        # The builder was fed the messages just before history_synced, which
+        # after a resume begin part-way into the log.
+        builder = self.prompt_builder
+        return self.history_synced - len(builder) + builder.window_start
+
+    def add_turn(self, user_message, reply):
+        self.messages.append("user", user_message)
+        self.messages.append("model", reply)
+
+    def clear(self):
+        self.messages.clear()
+        self.prompt_builder.reset()
+        self.history_synced = 0
+        self.retrieval = None
+
+
+class ChatPipeline:
+    """Turn a user message into a reply using shared, process-wide parts."""
+
+    def __init__(self, backend, cache, executor, metrics, system_prompt, retriever=None):
+        self.backend = backend
+        self.cache = cache
+        self.executor = executor
+        self.metrics = metrics
+        self.system_prompt = system_prompt
+        self.retriever = retriever
+        self._answered = False
+
+    def format_chat_history(self, session):
+        with self.metrics.timer("format_chat_history_seconds"):
+            return session.format_chat_history()
+
+    def get_fast_response(self, session, user_message, on_chunk=None):
+        started = time.perf_counter()
+        reply, from_backend = self._get_fast_response(session, user_message, on_chunk)
+        elapsed = time.perf_counter() - started
+        self.metrics.observe("get_fast_response_seconds", elapsed)
+        # Cache hits and failures say nothing about backend start-up cost.
+        if from_backend and not self._answered:
+            self._answered = True
+            self.metrics.observe("first_response_seconds", elapsed)
+            for name, seconds in self.backend.startup_timings.items():
+                self.metrics.observe(name, seconds)
+        return reply
+
+    def _get_fast_response(self, session, user_message, on_chunk):
+        metrics = self.metrics
+        history = self.format_chat_history(session)
+        context = ""
+        if self.retriever is not None:
+            with metrics.timer("retrieval_seconds"):
+                context = self.retriever.context(session, user_message)
+        key = cache_key(user_message, history + context) if is_cacheable(user_message) else None
+
+        cached_reply = self.cache.get(key) if key else None
+        if cached_reply is not None:
+            metrics.inc("cache_hits_total")
+            if on_chunk is not None:
+                on_chunk(cached_reply)
+            return cached_reply, False
+        if key:
+            metrics.inc("cache_misses_total")
+
+        prompt = build_prompt(self.system_prompt, user_message, history, context)
+        prompt_tokens = estimate_tokens(prompt)
+        metrics.observe("prompt_tokens", prompt_tokens, SIZE_BUCKETS)
+        metrics.inc("prompt_tokens_total", prompt_tokens)
+        try:
+            # Identical questions in flight at the same time share one model call.
+            result = self.executor.run(
+                key, lambda emit: stream_response(self.backend, prompt, emit), on_chunk)
+        except TimeoutError:
+            metrics.inc("model_timeouts_total")
+            return TIMEOUT_REPLY, False
+        except Exception:
+            # Retries (if the error was transient) have already run in the executor.
+            logger.exception("model call failed")
+            metrics.inc("model_errors_total")
+            return ERROR_REPLY, False
+
+        response_tokens = estimate_tokens(result.text)
+        metrics.observe("response_tokens", response_tokens, SIZE_BUCKETS)
+        metrics.inc("response_tokens_total", response_tokens)
+        metrics.observe("model_seconds", result.total_seconds)
+        if result.first_token_seconds is not None:
+            metrics.observe("model_first_token_seconds", result.first_token_seconds)
+        if key and result.text != FALLBACK_REPLY:
+            self.cache.put(key, result.text)
+        return result.text, True
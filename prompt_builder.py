@@ -0,0 +1,97 @@
+"""Incremental, budgeted chat history for the prompt."""
+
+from collections import deque
+
+SNIPPET_CHARS = 80
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text.
+    return (len(text) + 3) // 4
+
+
+class PromptBuilder:
+    """Keep the rendered history and only render the newest turn.
+
+    Recent turns are kept verbatim in a sliding window that fits within
+    ``budget`` (measured with ``length``, characters by default).  Turns
+    that fall out of the window are folded into a short summary of the
+    topics the user asked about, itself capped at ``summary_budget``.
+    """
+
+    def __init__(self, budget=8000, length=len, summary_budget=None):
+        self.budget = budget
+        self.length = length
+        self.summary_budget = summary_budget if summary_budget is not None else budget // 8
+        self.reset()
+
+    def reset(self):
+        self._window = deque()  # (role, line, size)
+        self._window_size = 0
+        self._topics = deque()  # (snippet, size)
+        self._topics_size = 0
+        self._summarized = 0
+        self._count = 0
+        self._rendered = ""
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def window_start(self):
+        """Index (among appended messages) of the oldest one still kept verbatim."""
+        return self._count - len(self._window)
+
+    def _render_line(self, role, text):
+        label = "User" if role == "user" else "AI"
+        line = f"{label}: {text}\n"
+        size = self.length(line)
+        if size > self.budget:
+            # A single oversized turn is trimmed rather than evicting everything else.
+            keep = max(1, len(text) * self.budget // size - len(label) - 3)
+            line = f"{label}: {text[:keep]}\n"
+            size = self.length(line)
+        return line, size
+
+    def _summarize(self, role, line):
+        self._summarized += 1
+        if role != "user":
+            return
+        text = line.split(": ", 1)[1][:SNIPPET_CHARS * 4]
+        snippet = " ".join(text.split())[:SNIPPET_CHARS]
+        size = self.length(snippet)
+        self._topics.append((snippet, size))
+        self._topics_size += size
+        while self._topics_size > self.summary_budget and len(self._topics) > 1:
+            self._topics_size -= self._topics.popleft()[1]
+
+    def append(self, role, text):
+        line, size = self._render_line(role, text)
+        self._window.append((role, line, size))
+        self._window_size += size
+        self._count += 1
+
+        evicted = False
+        while self._window_size > self.budget and len(self._window) > 1:
+            old_role, old_line, old_size = self._window.popleft()
+            self._window_size -= old_size
+            self._summarize(old_role, old_line)
+            evicted = True
+
+        if evicted:
+            self._rendered = self._render()
+        else:
+            self._rendered += line
+
+    def _render(self):
+        parts = []
+        if self._summarized:
+            topics = "; ".join(snippet for snippet, _ in self._topics)
+            parts.append(
+                f"(Summary of {self._summarized} earlier messages — "
+                f"the user asked about: {topics})\n")
+        parts.extend(line for _, line, _ in self._window)
+        return "".join(parts)
+
+    def history(self):
+        return self._rendered
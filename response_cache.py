@@ -0,0 +1,152 @@
+"""Cache model replies for repeated questions."""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+_TIME_SENSITIVE = re.compile(
+    r"\b(time|date|day|today|tonight|now|tomorrow|yesterday|current|latest)\b", re.IGNORECASE)
+
+
+def normalize_message(text):
+    return _WHITESPACE.sub(" ", text).strip().rstrip("?!. ").lower()
+
+
+def is_cacheable(user_message):
+    # The prompt carries the current date and time, so answers that depend
+    # on it must not be replayed from the cache.
+    return not _TIME_SENSITIVE.search(user_message)
+
+
+def cache_key(user_message, history):
+    history_digest = hashlib.sha256(history.encode("utf-8")).hexdigest()
+    normalized = normalize_message(user_message)
+    return hashlib.sha256(f"{normalized}\0{history_digest}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Base class: counts hits and misses around ``_get`` / ``_put``."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._put(key, value)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache bounded by entry count, total bytes and TTL."""
+
+    def __init__(self, max_entries=1000, max_bytes=8 * 1024 * 1024, ttl=3600):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, stored_at = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _put(self, key, value):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, old_size, _) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+
+
+class SQLiteResponseCache(ResponseCache):
+    """On-disk cache shared by every process that points at the same file."""
+
+    def __init__(self, path, max_entries=10000, ttl=24 * 3600):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, used_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def _put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now))
+            if self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+            self._conn.commit()
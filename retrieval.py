@@ -0,0 +1,281 @@
+"""Retrieve relevant past turns and local documents for the prompt.
+
+Vectors live in a NumPy matrix and are searched with one matrix product per
+batch of queries. A document index is saved as ``.npy`` files and loaded
+back memory-mapped, so restarts do not re-embed the corpus.
+"""
+
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+DOCUMENT_SUFFIXES = (".md", ".txt", ".rst")
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of words and word pairs.
+
+    Any object with ``dim`` and ``embed(texts) -> float32 array (n, dim)``
+    of unit-length rows can be used in its place.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.signature = f"hashing-{dim}"
+
+    def embed(self, texts):
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                # crc32 rather than hash() so vectors are stable across processes.
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(vectors, (rows, cols), signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """Unit vectors plus the text and source of each, searched by cosine similarity."""
+
+    def __init__(self, dim, capacity=256):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._size = 0
+        self.texts = []
+        self.sources = []
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        return self._vectors[:self._size]
+
+    def add(self, vectors, texts, sources):
+        count = len(texts)
+        if not count:
+            return
+        needed = self._size + count
+        if needed > self._vectors.shape[0] or not self._vectors.flags.writeable:
+            # Grow geometrically; this also copies a memory-mapped index into RAM.
+            grown = np.zeros((max(needed, 2 * self._vectors.shape[0]), self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        self._vectors[self._size:needed] = vectors
+        self._size = needed
+        self.texts.extend(texts)
+        self.sources.extend(sources)
+
+    def search(self, queries, k=4):
+        """Top ``k`` (score, text, source) per query row, best first."""
+        if not self._size:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self.vectors.T
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        results = []
+        for row in range(len(queries)):
+            results.append([
+                (float(top_scores[row, i]), self.texts[top[row, i]], self.sources[top[row, i]])
+                for i in order[row]
+            ])
+        return results
+
+    def save(self, directory, manifest=None):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "vectors.npy"), self.vectors)
+        with open(os.path.join(directory, "entries.json"), "w", encoding="utf-8") as f:
+            json.dump({"texts": self.texts, "sources": self.sources, "manifest": manifest}, f)
+
+    @classmethod
+    def load(cls, directory):
+        """Load a saved index with its vectors memory-mapped read-only."""
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "entries.json"), encoding="utf-8") as f:
+            entries = json.load(f)
+        index = cls(vectors.shape[1], capacity=0)
+        index._vectors = vectors
+        index._size = vectors.shape[0]
+        index.texts = entries["texts"]
+        index.sources = entries["sources"]
+        index.manifest = entries.get("manifest")
+        return index
+
+
+def chunk_text(text, max_chars=800):
+    """Split on blank lines, packing paragraphs into chunks of up to ``max_chars``."""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _document_manifest(docs_dir, embedder):
+    files = []
+    for root, _, names in os.walk(docs_dir):
+        for name in sorted(names):
+            if name.endswith(DOCUMENT_SUFFIXES):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append([os.path.relpath(path, docs_dir), stat.st_size, stat.st_mtime_ns])
+    return {"embedder": getattr(embedder, "signature", type(embedder).__name__), "files": sorted(files)}
+
+
+def build_document_index(docs_dir, embedder, index_dir=None, chunk_chars=800):
+    """Index every text document under ``docs_dir``.
+
+    With ``index_dir`` the index is saved there and reused, memory-mapped,
+    for as long as the documents and embedder are unchanged.
+    """
+    manifest = _document_manifest(docs_dir, embedder)
+    if index_dir and os.path.exists(os.path.join(index_dir, "entries.json")):
+        index = VectorIndex.load(index_dir)
+        if index.manifest == manifest:
+            return index
+
+    texts, sources = [], []
+    for relpath, _, _ in manifest["files"]:
+        with open(os.path.join(docs_dir, relpath), encoding="utf-8", errors="replace") as f:
+            for chunk in chunk_text(f.read(), chunk_chars):
+                texts.append(chunk)
+                sources.append(relpath)
+
+    index = VectorIndex(embedder.dim, capacity=max(1, len(texts)))
+    batch = 256
+    for start in range(0, len(texts), batch):
+        index.add(embedder.embed(texts[start:start + batch]),
+                  texts[start:start + batch], sources[start:start + batch])
+    if index_dir:
+        index.save(index_dir, manifest)
+    return index
+
+
+def _turn_text(message):
+    return f"{'User' if message.role == 'user' else 'AI'}: {message.text}"
+
+
+class TurnMemory:
+    """Embeddings of one session's turns, kept on its ChatSession.
+
+    Only vectors and absolute message positions are stored; the text is read
+    back from the MessageStore. Turns the store has dropped from memory are
+    dropped here too, so this stays within CHAT_MAX_MESSAGES / CHAT_MAX_CHARS.
+    """
+
+    def __init__(self, dim, capacity=64):
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._positions = np.zeros(capacity, dtype=np.int64)
+        self._start = 0  # first live row; rows before it are forgotten
+        self._size = 0
+        self.indexed = 0  # messages already embedded
+
+    def __len__(self):
+        return self._size - self._start
+
+    def add(self, vectors, first):
+        count = len(vectors)
+        live = self._size - self._start
+        if self._size + count > len(self._positions):
+            # Compact forgotten rows away, growing only if the live rows need it.
+            capacity = max(len(self._positions), 2 * (live + count))
+            grown = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float32)
+            grown[:live] = self._vectors[self._start:self._size]
+            positions = np.zeros(capacity, dtype=np.int64)
+            positions[:live] = self._positions[self._start:self._size]
+            self._vectors, self._positions = grown, positions
+            self._start, self._size = 0, live
+        self._vectors[self._size:self._size + count] = vectors
+        self._positions[self._size:self._size + count] = np.arange(first, first + count)
+        self._size += count
+
+    def forget_before(self, position):
+        self._start += int(np.searchsorted(self._positions[self._start:self._size], position))
+
+    def search(self, query_vector, k, before):
+        """Top ``k`` (score, position) among turns at positions below ``before``."""
+        end = self._start + int(np.searchsorted(self._positions[self._start:self._size], before))
+        if end == self._start:
+            return []
+        scores = self._vectors[self._start:end] @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(self._positions[self._start + i])) for i in top]
+
+
+class Retriever:
+    """Pick the ``k`` most relevant past turns and document chunks for a question.
+
+    Turns from the session's verbatim history window on are left out because
+    the prompt already carries them; hits scoring below ``min_score`` are
+    dropped. Only turns the MessageStore holds in memory are searched, which
+    after a resume are the newest ones reloaded from its log.
+    """
+
+    def __init__(self, embedder, documents=None, k=4, min_score=0.05, max_snippet_chars=600):
+        self.embedder = embedder
+        self.documents = documents
+        self.k = k
+        self.min_score = min_score
+        self.max_snippet_chars = max_snippet_chars
+
+    def _sync_turns(self, session):
+        messages = session.messages
+        memory = session.retrieval
+        if memory is None or memory.indexed > len(messages):
+            memory = session.retrieval = TurnMemory(self.embedder.dim)
+        new = messages.since(memory.indexed)
+        if new:
+            memory.add(self.embedder.embed([_turn_text(m) for m in new]), len(messages) - len(new))
+            memory.indexed = len(messages)
+        memory.forget_before(len(messages) - messages.in_memory)
+        return memory
+
+    def retrieve(self, session, query):
+        """Call after ``session.format_chat_history()``, which sets the verbatim window."""
+        memory = self._sync_turns(session)
+        query_vector = self.embedder.embed([query])
+
+        hits = []
+        turns = memory.search(query_vector[0], self.k, before=session.window_start)
+        if turns:
+            recent = list(session.messages)
+            offset = len(session.messages) - len(recent)
+            hits = [(score, _turn_text(recent[position - offset]), "earlier in this chat")
+                    for score, position in turns]
+        if self.documents is not None:
+            hits += self.documents.search(query_vector, self.k)[0]
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [hit for hit in hits[:self.k] if hit[0] >= self.min_score]
+
+    def context(self, session, query):
+        lines = []
+        for _, text, source in self.retrieve(session, query):
+            snippet = text if len(text) <= self.max_snippet_chars else text[:self.max_snippet_chars] + "…"
+            lines.append(f"[{source}] {snippet}")
+        return "\n".join(lines)
@@ -0,0 +1,38 @@
+"""Stream backend output chunk by chunk and time each turn."""
+
+import time
+
+FALLBACK_REPLY = "⚠️ AI could not generate a response."
+
+
+class StreamResult:
+    __slots__ = ("text", "first_token_seconds", "total_seconds")
+
+    def __init__(self, text, first_token_seconds, total_seconds):
+        self.text = text
+        self.first_token_seconds = first_token_seconds
+        self.total_seconds = total_seconds
+
+
+def stream_response(backend, prompt, on_chunk=None):
+    """Collect the reply from ``backend.stream(prompt)``.
+
+    ``on_chunk`` is called with the text received so far after every
+    non-empty chunk, so the caller can redraw a placeholder in place.
+    """
+    start = time.perf_counter()
+    first_token = None
+    parts = []
+
+    for text in backend.stream(prompt):
+        if not text:
+            continue
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        parts.append(text)
+        if on_chunk is not None:
+            on_chunk("".join(parts))
+
+    total = time.perf_counter() - start
+    reply = "".join(parts) or FALLBACK_REPLY
+    return StreamResult(reply, first_token, total)
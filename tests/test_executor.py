@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from backends import ServiceUnavailable
+from executor import ModelExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = ModelExecutor(max_concurrency=4, timeout=5, backoff=0, max_backoff=0)
+    yield executor
+    executor.shutdown()
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_identical_keys_share_one_call(executor):
+    release = threading.Event()
+    calls = []
+
+    def fn(emit):
+        calls.append(1)
+        release.wait(2)
+        emit("partial")
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(executor.run("k", fn)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: executor.stats["coalesced"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["answer"] * 5
+    assert executor._in_flight == {}
+
+
+def test_chunks_are_relayed_to_the_caller(executor):
+    seen = []
+
+    def fn(emit):
+        emit("a")
+        emit("ab")
+        return "ab"
+
+    assert executor.run(None, fn, seen.append) == "ab"
+    assert seen and seen[-1] == "ab"
+
+
+def test_transient_error_is_retried_until_success(executor):
+    attempts = []
+
+    def fn(emit):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ServiceUnavailable("503")
+        return "ok"
+
+    assert executor.run("k", fn) == "ok"
+    assert len(attempts) == 3
+    assert executor.stats["retries"] == 2
+
+
+def test_no_retry_once_text_was_emitted(executor):
+    attempts = []
+
+    def fn(emit):
+        attempts.append(1)
+        emit("half an answer")
+        raise ServiceUnavailable("503")
+
+    with pytest.raises(ServiceUnavailable):
+        executor.run("k", fn)
+    assert len(attempts) == 1
+    assert executor.stats["errors"] == 1
+
+
+def test_non_transient_error_is_not_retried(executor):
+    attempts = []
+
+    def fn(emit):
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        executor.run(None, fn)
+    assert len(attempts) == 1
+
+
+def test_timeout_is_raised_at_the_caller(executor):
+    release = threading.Event()
+    calls = []
+
+    def fn(emit):
+        calls.append(1)
+        release.wait(2)
+        return "late"
+
+    with pytest.raises(TimeoutError):
+        executor.run("k", fn, timeout=0.05)
+    assert executor.stats["timeouts"] == 1
+    # Nobody waits for the call any more, so a resend starts a new one.
+    assert executor._in_flight == {}
+
+    release.set()
+    assert executor.run("k", fn) == "late"
+    assert len(calls) == 2
+    wait_for(lambda: not executor._in_flight)
+
+
+def test_queued_calls_are_cancelled_when_their_caller_times_out():
+    executor = ModelExecutor(max_concurrency=1, timeout=5, backoff=0, max_backoff=0)
+    release = threading.Event()
+    calls = []
+
+    def fn(emit):
+        calls.append(1)
+        release.wait(2)
+        return "done"
+
+    blocker = threading.Thread(target=lambda: executor.run("first", fn))
+    blocker.start()
+    wait_for(lambda: calls)
+    for key in ("a", "b", "c"):
+        with pytest.raises(TimeoutError):
+            executor.run(key, fn, timeout=0.05)
+    release.set()
+    blocker.join()
+    executor.shutdown()
+
+    assert len(calls) == 1
+    assert executor.stats["cancelled"] == 3
+    assert executor._in_flight == {}
+
+
+def test_running_call_stops_streaming_once_abandoned(executor):
+    stopped = threading.Event()
+
+    def fn(emit):
+        try:
+            for i in range(200):
+                emit(str(i))
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+        return "all"
+
+    with pytest.raises(TimeoutError):
+        executor.run("k", fn, timeout=0.05)
+    assert stopped.wait(1)
+    assert executor.stats["errors"] == 0
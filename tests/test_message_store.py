@@ -0,0 +1,113 @@
+import pytest
+
+from message_store import MessageStore, is_valid_session_id
+
+SESSION = "0123456789abcdef0123456789abcdef"
+
+
+def texts(messages):
+    return [m.text for m in messages]
+
+
+def fill(store, count):
+    for i in range(count):
+        store.append("user" if i % 2 == 0 else "model", f"m{i}")
+
+
+def test_memory_is_capped_by_message_count():
+    store = MessageStore("test", max_messages=3)
+    fill(store, 5)
+
+    assert len(store) == 5
+    assert store.in_memory == 3
+    assert texts(store) == ["m2", "m3", "m4"]
+
+
+def test_memory_is_capped_by_characters():
+    store = MessageStore("test", max_chars=10)
+    for text in ("aaaa", "bbbb", "cccc"):
+        store.append("user", text)
+
+    assert texts(store) == ["bbbb", "cccc"]
+    # The newest message is always kept, however long.
+    store.append("user", "x" * 50)
+    assert texts(store) == ["x" * 50]
+
+
+def test_since_counts_absolute_positions():
+    store = MessageStore("test", max_messages=3)
+    fill(store, 5)
+
+    assert texts(store.since(3)) == ["m3", "m4"]
+    # Positions already evicted from memory are not returned.
+    assert texts(store.since(0)) == ["m2", "m3", "m4"]
+    assert store.since(5) == []
+
+
+def test_tail_reads_past_memory_from_the_log(tmp_path):
+    store = MessageStore(SESSION, directory=tmp_path, max_messages=2)
+    fill(store, 5)
+
+    assert texts(store.tail(2)) == ["m3", "m4"]
+    assert texts(store.tail(4)) == ["m1", "m2", "m3", "m4"]
+    assert texts(store.tail(10)) == ["m0", "m1", "m2", "m3", "m4"]
+    assert store.available == 5
+
+
+def test_tail_without_a_log_stops_at_memory():
+    store = MessageStore("test", max_messages=2)
+    fill(store, 5)
+
+    assert texts(store.tail(4)) == ["m3", "m4"]
+    assert store.available == 2
+
+
+def test_resume_restores_total_and_positions(tmp_path):
+    fill(MessageStore(SESSION, directory=tmp_path), 7)
+
+    store = MessageStore(SESSION, directory=tmp_path, max_messages=3)
+
+    assert len(store) == 7
+    assert texts(store) == ["m4", "m5", "m6"]
+    assert texts(store.since(5)) == ["m5", "m6"]
+    store.append("user", "m7")
+    assert texts(store.since(7)) == ["m7"]
+    assert len(MessageStore(SESSION, directory=tmp_path)) == 8
+
+
+def test_clear_deletes_the_log(tmp_path):
+    store = MessageStore(SESSION, directory=tmp_path)
+    fill(store, 3)
+    store.clear()
+
+    assert len(store) == 0
+    assert list(store) == []
+    assert not (tmp_path / f"{SESSION}.jsonl").exists()
+    assert len(MessageStore(SESSION, directory=tmp_path)) == 0
+
+
+@pytest.mark.parametrize("session_id, valid", [
+    (SESSION, True),
+    ("", False),
+    (None, False),
+    ("../../etc/passwd", False),
+    (SESSION.upper(), False),
+    (SESSION + "0", False),
+])
+def test_session_ids_are_validated(session_id, valid):
+    assert is_valid_session_id(session_id) is valid
+
+
+def test_partial_last_line_is_trimmed_on_resume(tmp_path):
+    fill(MessageStore(SESSION, directory=tmp_path), 10)
+    with open(tmp_path / f"{SESSION}.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"role": "user", "te')
+
+    store = MessageStore(SESSION, directory=tmp_path, max_messages=3)
+    assert len(store) == 10
+    assert texts(store) == ["m7", "m8", "m9"]
+    store.append("user", "after-crash")
+
+    resumed = MessageStore(SESSION, directory=tmp_path, max_messages=3)
+    assert len(resumed) == 11
+    assert texts(resumed) == ["m8", "m9", "after-crash"]
@@ -0,0 +1,79 @@
+import json
+import re
+
+import pytest
+
+from metrics import LATENCY_BUCKETS, Histogram, Metrics
+
+
+def test_empty_histogram_quantiles_are_zero():
+    summary = Histogram().summary()
+
+    assert summary["count"] == 0
+    assert summary["p50"] == summary["p99"] == 0.0
+
+
+def test_single_value_quantiles_stay_near_it():
+    histogram = Histogram()
+    histogram.observe(0.5)
+
+    for q in (0.0, 0.5, 0.99, 1.0):
+        assert 0.5 / 1.25 <= histogram.quantile(q) <= 0.5
+
+
+def test_quantiles_of_a_uniform_distribution():
+    histogram = Histogram()
+    for ms in range(1, 1001):
+        histogram.observe(ms / 1000)
+
+    assert histogram.quantile(0.50) == pytest.approx(0.50, rel=0.05)
+    assert histogram.quantile(0.95) == pytest.approx(0.95, rel=0.05)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.05)
+    assert histogram.quantile(1.0) == pytest.approx(1.0)
+    assert histogram.summary()["sum"] == pytest.approx(500.5)
+
+
+def test_values_above_the_top_bucket_are_capped_at_the_max():
+    histogram = Histogram()
+    top = LATENCY_BUCKETS[-1]
+    histogram.observe(0.01)
+    for _ in range(9):
+        histogram.observe(top * 4)
+
+    assert histogram.counts[-1] == 9
+    assert top <= histogram.quantile(0.95) <= top * 4
+    assert histogram.quantile(1.0) == top * 4
+
+
+def test_prometheus_buckets_are_cumulative():
+    metrics = Metrics()
+    metrics.inc("cache_hits_total", 3)
+    for value in (0.001, 0.02, 0.02, 0.3, 1000.0):
+        metrics.observe("model_seconds", value)
+
+    text = metrics.to_prometheus()
+    buckets = [(le, int(count)) for le, count in
+               re.findall(r'^chatbot_model_seconds_bucket\{le="([^"]+)"\} (\d+)$', text, re.M)]
+    counts = [count for _, count in buckets]
+
+    assert "chatbot_cache_hits_total 3" in text
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+    assert counts == sorted(counts)
+    assert buckets[-1] == ("+Inf", 5)
+    assert counts[-2] == 4  # 1000 s is above the top bound
+    assert re.search(r"^chatbot_model_seconds_count 5$", text, re.M)
+    assert text.endswith("\n")
+
+
+def test_json_lines_are_valid_json():
+    metrics = Metrics()
+    metrics.inc("cache_misses_total")
+    metrics.observe("model_seconds", 0.2)
+
+    records = [json.loads(line) for line in metrics.to_json_lines().splitlines()]
+
+    assert {(r["type"], r["name"]) for r in records} == {
+        ("counter", "cache_misses_total"), ("histogram", "model_seconds")}
+    histogram = next(r for r in records if r["type"] == "histogram")
+    assert histogram["count"] == 1
+    assert histogram["max"] == 0.2
@@ -0,0 +1,49 @@
+import pytest
+
+from backends import StubBackend
+from executor import ModelExecutor
+from message_store import MessageStore
+from metrics import Metrics
+from pipeline import ERROR_REPLY, TIMEOUT_REPLY, ChatPipeline, ChatSession
+from prompt_builder import PromptBuilder
+from response_cache import MemoryResponseCache, cache_key
+
+
+def make_pipeline(backend, **executor_options):
+    executor = ModelExecutor(max_concurrency=2, backoff=0, max_backoff=0, **executor_options)
+    return ChatPipeline(backend, MemoryResponseCache(), executor, Metrics(), "system")
+
+
+@pytest.fixture
+def session():
+    return ChatSession(MessageStore("test"), PromptBuilder())
+
+
+def test_backend_errors_become_an_error_reply(session):
+    pipeline = make_pipeline(StubBackend(failure_rate=1.0), max_retries=1)
+
+    assert pipeline.get_fast_response(session, "hello") == ERROR_REPLY
+    assert pipeline.metrics.snapshot()[1]["model_errors_total"] == 1
+    assert len(pipeline.cache) == 0
+
+
+def test_timeouts_become_a_timeout_reply(session):
+    pipeline = make_pipeline(StubBackend(first_token_latency=0.5), timeout=0.05)
+
+    assert pipeline.get_fast_response(session, "hello") == TIMEOUT_REPLY
+
+
+def test_first_response_is_only_recorded_for_backend_replies(session):
+    backend = StubBackend()
+    backend.startup_timings["model_init_seconds"] = 0.25
+    pipeline = make_pipeline(backend)
+    pipeline.cache.put(cache_key("hello", ""), "cached answer")
+
+    assert pipeline.get_fast_response(session, "hello") == "cached answer"
+    histograms = pipeline.metrics.snapshot()[0]
+    assert "first_response_seconds" not in histograms
+
+    pipeline.get_fast_response(session, "something new")
+    histograms = pipeline.metrics.snapshot()[0]
+    assert histograms["first_response_seconds"]["count"] == 1
+    assert histograms["model_init_seconds"]["count"] == 1
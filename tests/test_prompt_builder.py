@@ -0,0 +1,101 @@
+import pytest
+
+from prompt_builder import PromptBuilder, estimate_tokens
+
+
+def split_history(history):
+    """(summary line or "", verbatim lines) of a rendered history."""
+    if history.startswith("(Summary of "):
+        summary, _, rest = history.partition("\n")
+        return summary, rest
+    return "", history
+
+
+def feed(builder, count, words=12):
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "model"
+        builder.append(role, f"turn {i} " + "word " * words)
+
+
+@pytest.mark.parametrize("length, budget", [(len, 500), (estimate_tokens, 120)])
+def test_verbatim_history_stays_within_budget(length, budget):
+    builder = PromptBuilder(budget, length=length)
+    for count in range(1, 60):
+        feed(builder, 1, words=count % 17)
+        _, verbatim = split_history(builder.history())
+        assert sum(length(line + "\n") for line in verbatim.splitlines()) <= budget
+
+
+def test_evicted_turns_are_counted_in_the_summary():
+    builder = PromptBuilder(300, summary_budget=10 ** 6)
+    feed(builder, 20)
+
+    summary, _ = split_history(builder.history())
+
+    assert summary.startswith(f"(Summary of {builder.window_start} earlier messages")
+    assert "turn 0" in summary
+    # Only user turns are listed as topics.
+    assert "turn 1 " not in summary
+
+
+def test_summary_is_capped_at_summary_budget():
+    builder = PromptBuilder(300, summary_budget=100)
+    feed(builder, 60)
+
+    summary, _ = split_history(builder.history())
+    topics = summary.split("the user asked about: ", 1)[1].rstrip(")")
+
+    assert sum(len(topic) for topic in topics.split("; ")) <= 100
+    assert "turn 0 " not in topics
+    assert f"(Summary of {builder.window_start} earlier messages" in summary
+
+
+def test_oversized_turn_is_trimmed_not_evicting_everything():
+    builder = PromptBuilder(200)
+    builder.append("user", "short question")
+    builder.append("model", "x" * 1000)
+
+    _, verbatim = split_history(builder.history())
+
+    assert verbatim.startswith("AI: xxx")
+    assert len(verbatim) <= 200
+    assert builder.window_start == 1
+
+    # A later small turn still fits next to (or instead of) it.
+    builder.append("user", "follow-up")
+    assert builder.history().endswith("User: follow-up\n")
+
+
+def test_reset_empties_everything():
+    builder = PromptBuilder(200)
+    feed(builder, 20)
+    builder.reset()
+
+    assert builder.history() == ""
+    assert len(builder) == 0
+    assert builder.window_start == 0
+    builder.append("user", "hello")
+    assert builder.history() == "User: hello\n"
+
+
+def test_window_start_follows_evictions():
+    builder = PromptBuilder(10 ** 6)
+    feed(builder, 5)
+    assert builder.window_start == 0
+
+    builder = PromptBuilder(200)
+    feed(builder, 20)
+    _, verbatim = split_history(builder.history())
+
+    assert len(builder) == 20
+    assert builder.window_start == 20 - len(verbatim.splitlines())
+    assert verbatim.startswith(f"{'User' if builder.window_start % 2 == 0 else 'AI'}: "
+                               f"turn {builder.window_start} ")
+
+
+def test_incremental_history_matches_a_full_render():
+    builder = PromptBuilder(400, summary_budget=80)
+    for i in range(80):
+        # Mix short turns (appended in place) with long ones (forcing evictions).
+        builder.append("user" if i % 2 == 0 else "model", f"turn {i} " + "w " * (i * 7 % 90))
+        assert builder.history() == builder._render()
@@ -0,0 +1,126 @@
+import pytest
+
+import response_cache
+from backends import StubBackend
+from executor import ModelExecutor
+from message_store import MessageStore
+from metrics import Metrics
+from pipeline import ChatPipeline, ChatSession
+from prompt_builder import PromptBuilder
+from response_cache import (
+    MemoryResponseCache, SQLiteResponseCache, cache_key, is_cacheable, normalize_message)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "monotonic", clock)
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+def new_session():
+    return ChatSession(MessageStore("test"), PromptBuilder())
+
+
+def test_repeated_question_skips_backend():
+    backend = StubBackend()
+    cache = MemoryResponseCache()
+    executor = ModelExecutor(max_concurrency=2)
+    pipeline = ChatPipeline(backend, cache, executor, Metrics(), "system")
+    try:
+        first = pipeline.get_fast_response(new_session(), "What is a Python decorator?")
+        second = pipeline.get_fast_response(new_session(), "what is a python   decorator")
+    finally:
+        executor.shutdown()
+
+    assert second == first
+    assert backend.calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_normalizes_case_whitespace_and_trailing_punctuation():
+    assert normalize_message("  What is   a Decorator?! ") == "what is a decorator"
+    assert cache_key("What is a decorator?", "") == cache_key("what is a  decorator", "")
+    assert cache_key("What is a decorator?", "") != cache_key("What is a decorator?", "User: hi\n")
+
+
+def test_time_sensitive_questions_are_not_cacheable():
+    assert not is_cacheable("What time is it?")
+    assert not is_cacheable("what's the date today")
+    assert is_cacheable("What is a Python decorator?")
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_memory_cache_is_bounded_by_bytes():
+    cache = MemoryResponseCache(max_bytes=5)
+    cache.put("a", "123")
+    cache.put("b", "456")
+    cache.put("huge", "x" * 10)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "456"
+    assert cache.get("huge") is None
+
+
+def test_memory_cache_expires_entries(clock):
+    cache = MemoryResponseCache(ttl=60)
+    cache.put("a", "1")
+    clock.now += 59
+    assert cache.get("a") == "1"
+    clock.now += 2
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_trims_to_max_entries(tmp_path, clock):
+    cache = SQLiteResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("a", "1")
+    clock.now += 1
+    cache.put("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"
+    clock.now += 1
+    cache.put("c", "3")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+
+def test_sqlite_cache_expires_entries(tmp_path, clock):
+    cache = SQLiteResponseCache(str(tmp_path / "cache.db"), ttl=60)
+    cache.put("a", "1")
+    clock.now += 61
+
+    assert cache.get("a") is None
+    cache.put("b", "2")
+    assert len(cache) == 1
+
+
+def test_sqlite_cache_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteResponseCache(path).put("a", "1")
+
+    assert SQLiteResponseCache(path).get("a") == "1"
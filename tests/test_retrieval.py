@@ -0,0 +1,65 @@
+from message_store import MessageStore
+from pipeline import ChatSession
+from prompt_builder import PromptBuilder
+from retrieval import HashingEmbedder, Retriever
+
+FILLER = "Tell me something about Python packaging and virtual environments please. " * 3
+
+
+def make_session(store, budget=400):
+    return ChatSession(store, PromptBuilder(budget))
+
+
+def chat(session, turns):
+    for question, reply in turns:
+        session.add_turn(question, reply)
+    session.format_chat_history()
+
+
+def test_turns_just_outside_the_window_are_retrieved():
+    session = make_session(MessageStore("test"))
+    chat(session, [(FILLER, FILLER)] * 3
+         + [("What does a gamma walrus eat?", "The gamma walrus eats clams.")]
+         + [(FILLER, FILLER)] * 2)
+    # Only the newest couple of messages fit the window, so the walrus turn
+    # (four messages back) is in neither the prompt history nor a fixed skip.
+    assert session.window_start > 7
+
+    hits = Retriever(HashingEmbedder()).retrieve(session, "gamma walrus")
+
+    assert "gamma walrus" in hits[0][1]
+    assert hits[0][2] == "earlier in this chat"
+
+
+def test_turns_in_the_window_are_not_retrieved():
+    session = make_session(MessageStore("test"), budget=8000)
+    chat(session, [("What does a gamma walrus eat?", "The gamma walrus eats clams.")])
+
+    assert Retriever(HashingEmbedder()).retrieve(session, "gamma walrus") == []
+
+
+def test_turn_memory_follows_the_store_memory_cap():
+    session = make_session(MessageStore("test", max_messages=4))
+    retriever = Retriever(HashingEmbedder())
+    chat(session, [("What does a gamma walrus eat?", "The gamma walrus eats clams.")]
+         + [(FILLER, FILLER)] * 5)
+
+    hits = retriever.retrieve(session, "gamma walrus")
+
+    assert len(session.retrieval) == 4
+    assert all("walrus" not in text for _, text, _ in hits)
+
+
+def test_resumed_session_searches_the_reloaded_turns(tmp_path):
+    store = MessageStore("a" * 32, directory=tmp_path, max_messages=8)
+    chat(make_session(store), [("Old question about an alpha otter", "Otters.")]
+         + [("What does a gamma walrus eat?", "The gamma walrus eats clams.")]
+         + [(FILLER, FILLER)] * 3)
+
+    session = make_session(MessageStore("a" * 32, directory=tmp_path, max_messages=8))
+    session.format_chat_history()
+    hits = Retriever(HashingEmbedder()).retrieve(session, "gamma walrus")
+
+    assert session.window_start > len(session.messages) - session.messages.in_memory
+    assert "gamma walrus" in hits[0][1]
+    assert all("otter" not in text for _, text, _ in hits)
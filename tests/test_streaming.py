@@ -0,0 +1,41 @@
+from streaming import FALLBACK_REPLY, stream_response
+
+
+class FakeBackend:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def stream(self, prompt):
+        yield from self.chunks
+
+
+def test_on_chunk_receives_cumulative_text():
+    seen = []
+    result = stream_response(FakeBackend(["Hel", "lo", " there"]), "hi", seen.append)
+
+    assert seen == ["Hel", "Hello", "Hello there"]
+    assert result.text == "Hello there"
+
+
+def test_timings_are_recorded():
+    result = stream_response(FakeBackend(["a", "b"]), "hi")
+
+    assert result.first_token_seconds is not None
+    assert result.total_seconds >= result.first_token_seconds >= 0
+
+
+def test_empty_chunks_are_skipped():
+    seen = []
+    result = stream_response(FakeBackend(["", "a", "", "b"]), "hi", seen.append)
+
+    assert seen == ["a", "ab"]
+    assert result.text == "ab"
+
+
+def test_empty_stream_returns_fallback():
+    seen = []
+    result = stream_response(FakeBackend(["", ""]), "hi", seen.append)
+
+    assert result.text == FALLBACK_REPLY
+    assert result.first_token_seconds is None
+    assert seen == []
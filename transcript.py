@@ -0,0 +1,29 @@
+"""Render the chat transcript: memoized message HTML and a paged view."""
+
+PAGE_SIZE = 50
+
+
+def format_message(role, text):
+    if role == "user":
+        return f"<div class='chat-user'>🧑 <b>You:</b> {text}</div>"
+    return f"<div class='chat-ai'>🤖 <b>AI:</b> {text}</div>"
+
+
+def message_html(msg):
+    # Stored messages never change, so their HTML is built once and kept on
+    # the Message itself; it is freed along with the session's messages.
+    if msg.html is None:
+        msg.html = format_message(msg.role, msg.text)
+    return msg.html
+
+
+def render_message(container, msg):
+    container.markdown(message_html(msg), unsafe_allow_html=True)
+
+
+def render_transcript(container, messages, visible):
+    """Draw the newest ``visible`` messages of a MessageStore; return how many stay hidden."""
+    shown = messages.tail(visible)
+    for msg in shown:
+        render_message(container, msg)
+    return messages.available - len(shown)